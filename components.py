@@ -15,6 +15,7 @@ from powerful import PowerCurves, EfficiencyCurves
 
 class Component:
     refurb_tag = '-R'
+    signatures = {}
     '''
     A component is a physical object with a model (base)
     and model number (specific version). It can also have
@@ -51,7 +52,10 @@ class Component:
         The shop uses a template FRU to produce
         new versions.
         '''
-        signatures = [p for p in signature(self.__class__.__init__).parameters if p != 'self']
+        # look up constructor arguments once per class
+        if self.__class__ not in Component.signatures:
+            Component.signatures[self.__class__] = [p for p in signature(self.__class__.__init__).parameters if p != 'self']
+        signatures = Component.signatures[self.__class__]
         dictionary = self.__dict__
         attributes = {d: dictionary[d] for d in dictionary if d in signatures}
         updates = {k: kwargs[k] for k in kwargs if k in signatures}
@@ -21,6 +21,7 @@ class Monitor:
                            'fuel', 'Ceff', 'Weff', 'Peff',
                            'ceiling loss']
     power_eff_columns = ['date', 'total']
+    __slots__ = ('contract_date_range', '_performance', '_power', '_efficiency')
 
     def __init__(self, site_number: int, start_date: date, contract_length: int, windowed: bool):
         self.contract_date_range = date_range(start=start_date, periods=contract_length*12, freq='MS').date
@@ -5,11 +5,11 @@ from dateutil.relativedelta import relativedelta
 from datetime import date
 from random import randrange
 from math import floor
-from typing import List, Tuple, Union
+from typing import List, Dict, Tuple, Union
 
 # add-on imports
-from pandas import DataFrame, Series, concat, to_datetime, to_numeric, isna
-from numpy import nan
+from pandas import DataFrame, Series, Categorical
+from numpy import ndarray, integer, floating, nan, array, ones, insert, flatnonzero, bincount, searchsorted, random as nprandom
 
 # self-defined imports
 from structure import SQLDB
@@ -21,30 +21,73 @@ from groups import Thresholds, Technology, Tweaks
 
 # record of transactions and results across shop and fleet
 class LogBook:
+    transaction_columns = ['year', 'date', 'serial', 'model', 'model number', 'power', 'efficiency', 'action',
+                           'direction', 'site', 'server', 'enclosure', 'service cost', 'reason']
+    transaction_dtypes = {'power': 'float64', 'efficiency': 'float64', 'service cost': 'float64',
+                          'site': 'Int32', 'server': 'Int32', 'enclosure': 'Int32',
+                          'model': 'category', 'model number': 'category', 'direction': 'category', 'reason': 'category'}
+    action_codes = {} # actions are stored as integer codes shared across log books
+    site_position = transaction_columns.index('site')
+    __slots__ = ('transaction_rows', 'transaction_table', 'site_rows', 'performance')
+
     def __init__(self):
-        self.transactions = DataFrame(columns=['date', 'serial', 'model', 'model number', 'power', 'efficiency', 'action',
-                                               'direction', 'site', 'server', 'enclosure', 'service cost', 'reason'])
+        self.transaction_rows = []
+        self.transaction_table = None
+        self.site_rows = {} # buffer positions of each site's transactions
         self.performance = {'site': {}, 'fru': {}}
 
+    # build transaction table from buffered rows, rebuilding only when rows were added
+    @property
+    def transactions(self) -> DataFrame:
+        if (self.transaction_table is None) or (len(self.transaction_table) != len(self.transaction_rows)):
+            self.transaction_table = self.build_table(self.transaction_rows)
+
+        return self.transaction_table
+
+    # turn buffered rows into a typed transaction table
+    def build_table(self, rows: List[tuple], index: List[int] = None) -> DataFrame:
+        transactions = DataFrame(rows, columns=LogBook.transaction_columns, index=index)
+        transactions = transactions.astype(LogBook.transaction_dtypes, errors='ignore')
+        transactions['action'] = Categorical.from_codes(transactions['action'].astype(int), categories=list(LogBook.action_codes))
+
+        return transactions
+
+    # whole numbers are shifted to count from one, anything else is kept as is
     def number(self, value:float) -> int:
-        try:
-            if int(value) == value:
-                num = int(value) + 1
-            else:
-                num = value
-        except (TypeError, ValueError):
+        if isinstance(value, (int, integer)) or (isinstance(value, (float, floating)) and float(value).is_integer()):
+            num = int(value) + 1
+        else:
             num = value
-        
+
         return num
 
+    # format a transaction as a row for the log
+    def format_transaction(self, action_date: date, serial: str, model: str, model_number: str, power: float, efficiency: float,
+                           action: str, direction: str, site_number: str, server_number: str, enclosure_number: str, cost: float,
+                           reason: str = None) -> tuple:
+        action_code = LogBook.action_codes.setdefault(action, len(LogBook.action_codes))
+        row = (action_date.year, action_date, serial, model, model_number, power, efficiency,
+               action_code, direction,
+               self.number(site_number), self.number(server_number), self.number(enclosure_number),
+               cost, reason)
+        return row
+
     # record log of transactions
     def record_transaction(self, action_date: date, serial: str, model: str, model_number: str, power: float, efficiency: float,
                            action: str, direction: str, site_number: str, server_number: str, enclosure_number: str, cost: float,
                            reason: str = None):
-        self.transactions.loc[len(self.transactions), :] = [action_date, serial, model, model_number, power, efficiency,
-                                                            action, direction,
-                                                            self.number(site_number), self.number(server_number), self.number(enclosure_number),
-                                                            cost, reason]
+        self.record_transactions([self.format_transaction(action_date, serial, model, model_number, power, efficiency,
+                                                          action, direction, site_number, server_number, enclosure_number, cost, reason)])
+
+    # record log of several formatted transactions at once
+    def record_transactions(self, rows: List[tuple]):
+        for position, row in enumerate(rows, start=len(self.transaction_rows)):
+            site = row[LogBook.site_position]
+            if site not in self.site_rows:
+                self.site_rows[site] = []
+            self.site_rows[site].append(position)
+
+        self.transaction_rows.extend(rows)
 
     # store power and efficiency
     def record_performance(self, table: str, site_number: str, *args):
@@ -53,22 +96,21 @@ class LogBook:
             self.performance['site'][site_number] = performance
 
         elif table == 'fru':
-            power, efficiency = args
-
-            power.insert(0, 'site', site_number)
-            efficiency.insert(0, 'site', site_number)
+            power, efficiency = args # already keyed by site number, so not tagged with a site column
             self.performance['fru'][site_number] = {'power': power, 'efficiency': efficiency}
 
     # combine transactions by year, site and action
     def get_transactions(self, site_number: str = None, last_date: bool = None) -> DataFrame:
-        transactions = self.transactions.copy()
-
-        if site_number is not None:
-            filter = (transactions['site'] == site_number+1)
+        if site_number is None:
+            transactions = self.transactions
 
+        else:
+            # only the site's own rows are looked at and typed
+            positions = self.site_rows.get(site_number+1, [])
             if last_date is not None:
-                filter &= (transactions['date'] == last_date)
-            transactions = transactions[filter]
+                positions = [position for position in positions if self.transaction_rows[position][1] == last_date]
+
+            transactions = self.build_table([self.transaction_rows[position] for position in positions], index=positions)
 
         return transactions
 
@@ -76,31 +118,37 @@ class LogBook:
         performance = self.performance[table][site_number]
         return performance
 
-    # return series of value if site is target site
-    def identify_target(self, sites: DataFrame, site_number: str,
-                        site_col: str = 'site', site_adder: bool = True, target_col: str = 'target') -> DataFrame:
-        target_series = sites[site_col] == (site_number + site_adder)
-        target_identified = concat([sites, target_series.rename(target_col)], axis='columns')
+    # combine transactions by year, site and action in one pass over the buffered rows
+    def summarize_transactions(self, site_number: str) -> DataFrame:
+        actions = list(LogBook.action_codes)
+        totals = {}
 
-        return target_identified
+        for year, _, _, _, _, power, _, action, _, site, _, _, cost, _ in self.transaction_rows:
+            if site is None: # not at a site, such as FRUs junked in storage
+                continue
 
-    # combine transactions by year, site and action
-    def summarize_transactions(self, site_number: str) -> DataFrame:
-        transactions_yearly = self.get_transactions()
-        transactions_yearly.insert(0, 'year', to_datetime(transactions_yearly['date']).dt.year)
-        transactions_gb = transactions_yearly[['year', 'site', 'action', 'service cost', 'power']].groupby(['year', 'site', 'action'])
-        
-        transactions_sum = transactions_gb.sum()[['service cost', 'power']]
-        transactions_count = transactions_gb.count()[['service cost']].rename(columns={'service cost': 'count'})
-        
-        transactions_summarized = concat([transactions_sum, transactions_count], axis='columns').reset_index()
+            key = (year, site, action)
+            if key not in totals:
+                totals[key] = [0, 0, 0]
 
-        transactions = self.identify_target(transactions_summarized, site_number)
+            total = totals[key]
+            if (cost is not None) and (cost == cost):
+                total[0] += cost
+                total[2] += 1
+            if (power is not None) and (power == power):
+                total[1] += power
 
-        return transactions
+        transactions_summarized = DataFrame([(year, site, actions[action], *total) for (year, site, action), total in totals.items()],
+                                            columns=['year', 'site', 'action', 'service cost', 'power', 'count'])
+
+        transactions_summarized['target'] = transactions_summarized['site'] == (site_number + 1)
+
+        return transactions_summarized
 
 # template for new modules and servers
 class Templates:
+    __slots__ = ('power_modules', 'hot_boxes', 'energy_servers', 'components')
+
     def __init__(self, power_modules: PowerModules, hot_boxes: HotBoxes, energy_servers: EnergyServers):
         self.power_modules = power_modules
         self.hot_boxes = hot_boxes
@@ -109,14 +157,20 @@ class Templates:
         self.components = {comp: {} for comp in ['module', 'enclosure', 'server']}
 
     def find_component(self, component_type: str, model: str = None, mark: str = None, model_number: str = None, serial = None, **kwargs) -> Component:
-        key = tuple(m for m in [model, mark, model_number] if m is not None)
-        
+        component = self.get_template(component_type, model, mark, model_number).copy(serial, **kwargs)
+
+        return component
+
+    # return the base component to copy from, building it the first time
+    def get_template(self, component_type: str, model: str = None, mark: str = None, model_number: str = None) -> Component:
+        key = (model, mark, model_number) # fixed shape, unused parts stay None
+
         if key not in self.components[component_type]:
             self.ghost_component(component_type, key, model, mark, model_number)
 
-        component = self.components[component_type][key].copy(serial, **kwargs)
+        template = self.components[component_type][key]
 
-        return component
+        return template
 
     def ghost_component(self, component_type: str, key: tuple, model: str = None, mark: str = None, model_number: str = None):
         if component_type == 'module':
@@ -161,6 +215,11 @@ class Templates:
 
 # warehouse to store, repair and deploy old FRUs and create new FRUs
 class Shop:
+    __slots__ = ('power_modules', 'hot_boxes', 'energy_servers', 'templates', 'bank', 'log_book', 'date', 'next_serial',
+                 'thresholds', 'non_replace', 'tweaks', 'redeploy', 'best', 'roadmap', 'storage', 'deployable', 'junked',
+                 'salvage', 'compatible_modules', 'module_values', 'server_models', 'enclosure_details', 'new_models',
+                 'costs')
+
     def __init__(self, sql_db: SQLDB, thresholds: Thresholds, install_date: date, non_replace: DataFrame, tweaks: Tweaks, technology: Technology):
         self.power_modules = PowerModules(sql_db)
         self.hot_boxes = HotBoxes(sql_db)
@@ -173,6 +232,10 @@ class Shop:
         self.thresholds = thresholds
         self.tweaks = tweaks
 
+        # tweaks are set per scenario and don't change during a run
+        self.redeploy = bool(tweaks['redeploy'])
+        self.best = bool(tweaks['best'])
+
         self.storage = []
         self.deployable = []
         self.junked = []
@@ -185,6 +248,13 @@ class Shop:
 
         self.next_serial = {'ES': 0, 'PWM': 0, 'ENC': 0}
 
+        self.compatible_modules = {}
+        self.module_values = {'stacks': {}, 'rating': {}, 'energy': {}, 'efficiency': {}}
+        self.server_models = {}
+        self.enclosure_details = {}
+        self.new_models = {}
+        self.costs = {}
+
     # record log of transactions
     def transact(self, serial: str, model: str, model_number: str, power: float, efficiency: float,
                  action: str, direction: str, site_number: str, server_number: str, enclosure_number: str, cost: float, reason: str = None):
@@ -194,14 +264,86 @@ class Shop:
     # return serial number for component tracking
     def get_serial(self, component: str) -> str:
         self.next_serial[component] += 1
-        serial = '{}{}'.format(component, str(self.next_serial[component]).zfill(6))
+        serial = '{}{:06d}'.format(component, self.next_serial[component])
         return serial
 
     # get cost for action
     def get_cost(self, action: str, component: str = None, **kwargs) -> float:
-        cost = self.bank.get_cost(self.date, action, component, **kwargs)
+        # costs that only depend on the date, action and component model are looked up once
+        if kwargs:
+            cost = self.bank.get_cost(self.date, action, component, **kwargs)
+
+        else:
+            key = (self.date, action, getattr(component, 'model', None), getattr(component, 'mark', None))
+            if key not in self.costs:
+                self.costs[key] = self.bank.get_cost(self.date, action, component)
+
+            cost = self.costs[key]
+
         return cost
 
+    # get power modules that work with energy server, reusing earlier lookups
+    def get_compatible_modules(self, server_model: str) -> frozenset:
+        if server_model not in self.compatible_modules:
+            self.compatible_modules[server_model] = frozenset(self.energy_servers.get_compatible_modules(server_model).to_list())
+
+        allowed_modules = self.compatible_modules[server_model]
+        return allowed_modules
+
+    # get server model details, reusing earlier lookups
+    def get_server_details(self, server_model_number: str = None, server_model_class: str = None, nameplate_needed: float = 0,
+                           n_enclosures: int = None) -> Series:
+        key = (server_model_number, server_model_class, nameplate_needed, n_enclosures)
+
+        if key not in self.server_models:
+            self.server_models[key] = self.energy_servers.get_server_model(server_model_number=server_model_number,
+                                                                           server_model_class=server_model_class,
+                                                                           nameplate_needed=nameplate_needed,
+                                                                           n_enclosures=n_enclosures)
+
+        server_model = self.server_models[key]
+        return server_model
+
+    # get enclosure model number and nameplate for a server model, reusing earlier lookups
+    def get_enclosure_details(self, server_model: str) -> Tuple[str, float]:
+        if server_model not in self.enclosure_details:
+            self.enclosure_details[server_model] = self.hot_boxes.get_model_details(server_model)
+
+        model_number, nameplate = self.enclosure_details[server_model]
+        return model_number, nameplate
+
+    # get best new power module for requirements, reusing earlier lookups when the pick isn't random
+    def get_new_model(self, install_date: date, server_model: str, wait_period: bool = False, power_needed: float = 0,
+                      max_power: float = None, energy_needed: float = 0, time_needed: int = 0) -> Tuple[str, str, str]:
+        # a wait period draws module availability at random, so each pick must be made fresh
+        if wait_period:
+            module = self.power_modules.get_model(install_date, wait_period=wait_period,
+                                                  power_needed=power_needed, max_power=max_power,
+                                                  energy_needed=energy_needed, time_needed=time_needed,
+                                                  best=self.best, server_model=server_model, roadmap=self.roadmap)
+
+        else:
+            key = (install_date, server_model, power_needed, max_power, energy_needed, time_needed)
+            if key not in self.new_models:
+                self.new_models[key] = self.power_modules.get_model(install_date, power_needed=power_needed, max_power=max_power,
+                                                                    energy_needed=energy_needed, time_needed=time_needed,
+                                                                    best=self.best, server_model=server_model, roadmap=self.roadmap)
+
+            module = self.new_models[key]
+
+        return module
+
+    # get data sheet value of a FRU's power module, reusing earlier lookups
+    def get_module_value(self, value: str, fru: FRU, **kwargs) -> Union[float, List[int]]:
+        key = (fru.model, fru.mark, fru.model_number, *kwargs.values())
+        values = self.module_values[value]
+
+        if key not in values:
+            get_value = getattr(self.power_modules, 'get_{}'.format(value))
+            values[key] = get_value(fru.model, fru.mark, fru.model_number, **kwargs)
+
+        return values[key]
+
     # get if shop is operational and not in downside years
     def is_replaceable_time(self) -> bool:
         replaceable = not ((self.date >= self.non_replace['start']) & (self.date < self.non_replace['end'])).any()
@@ -246,16 +388,21 @@ class Shop:
         if self.tweaks['repair'] and repair:
             self.storage[-1].repair()
 
-            cost = self.get_cost('repair fru', fru, operating_time=fru.get_month(), power=fru.get_power())
+            power = fru.get_power()
+            cost = self.get_cost('repair fru', fru, operating_time=fru.get_month(), power=power)
 
-            self.transact(fru.serial, fru.model, fru.get_model_number(), fru.get_power(), fru.get_efficiency(),
+            self.transact(fru.serial, fru.model, fru.get_model_number(), power, fru.get_efficiency(),
                           'repaired FRU', 'from', site_number, server_number, enclosure_number, cost, reason=reason)
 
         return
 
     # take a FRU out of storage to send to site    
     def deploy_fru(self, queue: int, site_number: int, server_number: str, enclosure_number: str, reason: str = None) -> FRU:
-        fru = self.deployable.pop(queue)
+        # swap with the last deployable FRU so the pop doesn't shift the list
+        last = len(self.deployable) - 1
+        if queue != last:
+            self.deployable[queue], self.deployable[last] = self.deployable[last], self.deployable[queue]
+        fru = self.deployable.pop()
         
         cost = self.get_cost('deploy fru')
 
@@ -266,27 +413,37 @@ class Shop:
 
     # get value for FRUs leftover after a contract expires and use for redeploys
     def salvage_frus(self):
+        transactions = []
         for fru in self.storage:
-            cost = self.get_cost('salvage fru', fru, operating_time=fru.get_month(), power=fru.get_power())
+            power = fru.get_power()
+            cost = self.get_cost('salvage fru', fru, operating_time=fru.get_month(), power=power)
 
-            self.transact(fru.serial, fru.model, fru.get_model_number(), fru.get_power(), fru.get_efficiency(), 'salvaged FRU',
-                          'in storage', None, None, None, cost, reason='end of contract')
-            self.salvage.append(fru)
-        self.storage = []
+            transactions.append(self.log_book.format_transaction(self.date, fru.serial, fru.model, fru.get_model_number(),
+                                                                 power, fru.get_efficiency(), 'salvaged FRU',
+                                                                 'in storage', None, None, None, cost, reason='end of contract'))
+        self.log_book.record_transactions(transactions)
+
+        self.salvage.extend(self.storage)
+        self.storage.clear()
 
     # move FRUs between energy servers at a site
     def balance_frus(self, fru: FRU, site_number: int, server1: str, enclosure1: str, server2: str, enclosure2: str, reason: str = None):
         cost = self.get_cost('balance fru')
+        model_number, power, efficiency = fru.get_model_number(), fru.get_power(), fru.get_efficiency()
 
-        self.transact(fru.serial, fru.model, fru.get_model_number(), fru.get_power(), fru.get_efficiency(),
+        self.transact(fru.serial, fru.model, model_number, power, efficiency,
                       'pulled FRU', 'from', site_number, server1, enclosure1, cost/2, reason=reason)
 
-        self.transact(fru.serial, fru.model, fru.get_model_number(), fru.get_power(), fru.get_efficiency(),
+        self.transact(fru.serial, fru.model, model_number, power, efficiency,
                      'moved FRU', 'to', site_number, server2, enclosure2, cost/2, reason=reason)
 
     # overhaul a FRU to make it refurbished and bespoke
     def overhaul_fru(self, queue: int, stacks: List[int], site_number: str, server_number: str, enclosure_number: str, reason: str = None) -> FRU:
-        fru = self.junked.pop(queue)
+        # swap with the last junked FRU so the pop doesn't shift the list
+        last = len(self.junked) - 1
+        if queue != last:
+            self.junked[queue], self.junked[last] = self.junked[last], self.junked[queue]
+        fru = self.junked.pop()
 
         fru.overhaul(stacks)
         cost = self.get_cost('overhaul fru', fru, power=fru.rating * fru.stack_reducer)
@@ -314,134 +471,106 @@ class Shop:
             return model
 
     # find FRU in deployable or junk that best fits requirements
-    def find_fru(self, allowed_models: Series, power_needed: float = 0, energy_needed: float = 0, efficiency_needed: float = 0, 
+    def find_fru(self, allowed_models: frozenset, power_needed: float = 0, energy_needed: float = 0, efficiency_needed: float = 0, 
                  time_needed: int = 0, max_power: float = None, junked: bool = False) -> Tuple[int, int]:
-        powers = self.list_powers(allowed_models, junked=junked) - power_needed
-        energies = self.list_energies(allowed_models, time_needed, junked=junked) - energy_needed
-        efficiencies = self.list_efficiencies(allowed_models, junked=junked) - efficiency_needed
-
-        found = \
-            (powers.where(powers > 0) if power_needed > 0 else 1) * \
-            (powers.where(powers < (max_power - power_needed)) if max_power is not None else 1) * \
-            (energies.where(energies > 0)/time_needed if energy_needed > 0 else 1) * \
-            (efficiencies.where(efficiencies > 0) if efficiency_needed > 0 else 1)
-
-        queue, stacks = [None]*2
-
-        if (found is not 1):
-            for c in found.columns:
-                found.loc[:, c] = to_numeric(found[c], errors='coerce')
-            
-            if not found.empty and not found.stack().empty:
-                idx = found.stack().idxmin()
-                if not isna(idx):
-                    queue, stacks = idx
-
-        return queue, stacks
+        # nothing to look for
+        if not ((power_needed > 0) or (max_power is not None) or (energy_needed > 0) or (efficiency_needed > 0)):
+            return None, None
+
+        options = self.list_options(allowed_models, time_needed=time_needed, junked=junked, energy=energy_needed > 0)
+        powers = options['power'] - power_needed
+        energies = options['energy'] - energy_needed
+        efficiencies = options['efficiency'] - efficiency_needed
+
+        # options must meet every requirement and are scored by the product of what they exceed it by
+        mask = ones(len(powers), dtype=bool)
+        factors = []
+
+        if power_needed > 0:
+            mask &= powers > 0
+            factors.append(powers)
+        if max_power is not None:
+            mask &= powers < (max_power - power_needed)
+            factors.append(powers)
+        if energy_needed > 0:
+            mask &= energies > 0
+            factors.append(energies/time_needed)
+        if efficiency_needed > 0:
+            mask &= efficiencies > 0
+            factors.append(efficiencies)
+
+        # a single requirement is scored on its own margin
+        score = factors[0]
+        for factor in factors[1:]:
+            score = score * factor
+
+        queue, stack = [None]*2
+
+        if mask.any():
+            candidates = flatnonzero(mask)
+            idx = candidates[score[candidates].argmin()]
+            queue, stack = int(options['queue'][idx]), int(options['stacks'][idx])
+
+        return queue, stack
     
-    # get power value of each fru in storage
-    def list_powers(self, allowed_models: Series, junked: bool = False) -> DataFrame:
-        powers = DataFrame(columns=self.list_stacks(allowed_models, junked))
+    # get storage position, stacks, power, energy and efficiency of each fru option in storage
+    def list_options(self, allowed_models: frozenset, time_needed: int = 0, junked: bool = False, energy: bool = True) -> Dict[str, ndarray]:
         location = self.junked if junked else self.deployable
-        for fru in location:
-            if fru.model in allowed_models.to_list():
-                if junked:
-                    stacks = self.power_modules.get_stacks(fru.model, fru.mark, fru.model_number)
-                    power = [self.power_modules.get_rating(fru.model, fru.mark, fru.model_number) * (stack/fru.stacks) for stack in stacks]
-                    powers.loc[location.index(fru), stacks] = power
 
-                else:
-                    powers.loc[location.index(fru), fru.stacks] = fru.get_power()
-                    
-        return powers
+        options = []
+        for queue, fru in enumerate(location):
+            if fru.model in allowed_models:
+                if junked: # junked FRUs can be overhauled to any stack count the model allows
+                    rating = self.get_module_value('rating', fru)
+                    module_energy = self.get_module_value('energy', fru, time_needed=time_needed) if energy else nan
+                    efficiency = self.get_module_value('efficiency', fru)
+                    for stack in self.get_module_value('stacks', fru):
+                        reducer = stack/fru.stacks
+                        options.append((queue, stack, rating * reducer, module_energy * reducer, efficiency * reducer))
 
-    # get energy value of each fru in storage
-    def list_energies(self, allowed_models: Series, time_needed: int, junked: bool = False) -> DataFrame:
-        energies = DataFrame(columns=self.list_stacks(allowed_models, junked))
-        location = self.junked if junked else self.deployable
-        for fru in location:
-            if fru.model in allowed_models.to_list():
-                if junked:
-                    stacks = self.power_modules.get_stacks(fru.model, fru.mark, fru.model_number)
-                    energy = [self.power_modules.get_energy(fru.model, fru.mark, fru.model_number,
-                                                            time_needed=time_needed) * (stack/fru.stacks) for stack in stacks]
-                    energies.loc[location.index(fru), stacks] = energy
-                        
                 else:
-                    energies.loc[location.index(fru), fru.stacks] = fru.get_energy(months=time_needed)
+                    power = fru.get_power()
+                    fru_energy = fru.get_energy(months=time_needed) if energy else nan
+                    options.append((queue, fru.stacks, power, fru_energy, power * fru.get_efficiency()))
 
-        return energies
+        values = array(options, dtype=float).reshape(-1, 5)
+        option_values = {'queue': values[:, 0].astype(int), 'stacks': values[:, 1].astype(int),
+                         'power': values[:, 2], 'energy': values[:, 3], 'efficiency': values[:, 4]}
 
-    # get efficiency value of each fru in storage
-    def list_efficiencies(self, allowed_models: Series, junked: bool = False) -> DataFrame:
-        efficiencies = DataFrame(columns=self.list_stacks(allowed_models, junked))
-        location = self.junked if junked else self.deployable
-        for fru in location:
-            if fru.model in allowed_models.to_list():
-                if junked:
-                    stacks = self.power_modules.get_stacks(fru.model, fru.mark, fru.model_number)
-                    efficiency = [self.power_modules.get_efficiency(fru.model, fru.mark, fru.model_number) * \
-                                    (stack/fru.stacks) for stack in stacks]
-                    efficiencies.loc[location.index(fru), stacks] = efficiency
-
-                else:
-                    efficiencies.loc[location.index(fru), fru.stacks] = fru.get_power() * fru.get_efficiency()
-
-        return efficiencies
-
-    # get stack value of each fru in storage
-    def list_stacks(self, allowed_models: Series, junked: bool = False) -> List[int]:
-        if junked:
-            stacks_list = [x for y in [self.power_modules.get_stacks(fru.model, fru.mark, fru.model_number) \
-                for fru in self.junked if fru.model in allowed_models.to_list()] for x in y]
-        else:
-            stacks_list = [fru.stacks for fru in self.deployable if fru.model in allowed_models.to_list()]
-
-        stacks_list = list(set(stacks_list))
-
-        return stacks_list
+        return option_values
 
     # use a stored FRU or create a new one for power and energy requirements
     def get_best_fit_fru(self, server_model: str, install_date: date, site_number: int, server_number: str, enclosure_number: str,
                          power_needed: float = 0, energy_needed: float = 0, efficiency_needed: float = 0, time_needed: int = 0,
                          max_power: float = None, initial: bool = False, reason: str = None) -> FRU:
-        allowed_modules = self.energy_servers.get_compatible_modules(server_model)
+        allowed_modules = self.get_compatible_modules(server_model)
        
-        storage_location = {'deployable': False, 'junked': True}
-        queues = {}
+        requirements = {'power_needed': power_needed, 'energy_needed': energy_needed, 'efficiency_needed': efficiency_needed,
+                        'time_needed': time_needed, 'max_power': max_power}
 
-        for location in storage_location:
-            powers = self.list_powers(allowed_modules, storage_location[location])
-            energies = self.list_energies(allowed_modules, time_needed, storage_location[location])
-            efficiencies = self.list_efficiencies(allowed_modules, storage_location[location])
+        # storage is only searched when it can be used, and junked FRUs only if no deployable FRU fits
+        redeployable = self.redeploy and (not initial)
+        deploy_queue, overhaul_queue, stacks = [None]*3
 
-            queues[location] = self.find_fru(allowed_modules, junked=storage_location[location],
-                                             power_needed=power_needed, energy_needed=energy_needed, efficiency_needed=efficiency_needed,
-                                             time_needed=time_needed, max_power=max_power)
-        
-        if self.tweaks['redeploy'] and (not initial) and len(self.deployable) and (queues['deployable'][0] is not None):
+        if redeployable and self.deployable:
+            deploy_queue, _ = self.find_fru(allowed_modules, junked=False, **requirements)
+
+        if redeployable and self.junked and (deploy_queue is None):
+            overhaul_queue, stacks = self.find_fru(allowed_modules, junked=True, **requirements)
+
+        if deploy_queue is not None:
             # there is a FRU available to deploy
-            queue, _ = queues['deployable']
-            fru = self.deploy_fru(queue, site_number, server_number, enclosure_number, reason=reason)
+            fru = self.deploy_fru(deploy_queue, site_number, server_number, enclosure_number, reason=reason)
 
-        elif self.tweaks['redeploy'] and (not initial) and len(self.junked) and (queues['junked'][0] is not None):
+        elif overhaul_queue is not None:
             # there is a FRU available to overhaul
-            queue, stacks = queues['junked']
-            fru = self.overhaul_fru(queue, stacks, site_number, server_number, enclosure_number, reason=reason)
+            fru = self.overhaul_fru(overhaul_queue, stacks, site_number, server_number, enclosure_number, reason=reason)
 
         else:
             # there is not a FRU available, so create a new one
-            if self.tweaks['best']:
-                module = self.power_modules.get_model(install_date, wait_period=not initial,
-                                                      power_needed=power_needed, max_power=max_power,
-                                                      energy_needed=energy_needed, time_needed=time_needed,
-                                                      best=self.tweaks['best'], server_model=server_model, roadmap=self.roadmap)
-
-            else:
-                module = self.power_modules.get_model(install_date, wait_period=not initial,
-                                                      power_needed=power_needed, max_power=max_power,
-                                                      energy_needed=energy_needed, time_needed=time_needed,
-                                                      server_model=server_model, roadmap=self.roadmap) ##bespoke=not initial
+            module = self.get_new_model(install_date, server_model, wait_period=not initial,
+                                        power_needed=power_needed, max_power=max_power,
+                                        energy_needed=energy_needed, time_needed=time_needed) ##bespoke=not initial
 
             if module is not None:
                 # can create a FRU accoring to requirements
@@ -457,7 +586,7 @@ class Shop:
 
     # get base model of a server model number
     def get_server_model(self, server_model_number: str) -> str:
-        server_model = self.energy_servers.get_server_model(server_model_number=server_model_number)['model']
+        server_model = self.get_server_details(server_model_number=server_model_number)['model']
         return server_model
     
     # create a new energy server
@@ -468,10 +597,8 @@ class Shop:
 
         n_enclosures = len(enclosure_numbers) if (enclosure_numbers is not None) else None
 
-        server_model = self.energy_servers.get_server_model(server_model_number=server_model_number,
-                                                            server_model_class=server_model_class,
-                                                            nameplate_needed=nameplate_needed,
-                                                            n_enclosures=n_enclosures)
+        server_model = self.get_server_details(server_model_number=server_model_number, server_model_class=server_model_class,
+                                               nameplate_needed=nameplate_needed, n_enclosures=n_enclosures)
         
         server = self.templates.find_component('server', model=server_model['model'], model_number=server_model['model_number'],
                                                serial=serial, number=server_number)
@@ -482,7 +609,7 @@ class Shop:
         self.transact(server.serial, server.model, server.get_model_number(), server.nameplate, None,
                       'installed ES', 'at', site_number, server.number, None, cost, reason=reason)
 
-        enclosure_model_number, _ = self.hot_boxes.get_model_details(server_model['model'])
+        enclosure_model_number, _ = self.get_enclosure_details(server_model['model'])
 
         enclosures = self.create_enclosures(site_number, server, server.model, enclosure_model_number,
                                             enclosure_count=server_model['enclosures'], plus_one_count=server_model['plus_one'],
@@ -505,7 +632,7 @@ class Shop:
     def upgrade_enclosures(self, site_number: int, server: Server, new_fru: FRU, reason: str = None):
         cost = self.get_cost('upgrade enclosure')
 
-        enclosure_model_number, enclosure_nameplate = self.hot_boxes.get_model_details(new_fru.model)
+        enclosure_model_number, enclosure_nameplate = self.get_enclosure_details(new_fru.model)
 
         for enclosure in server.get_enclosures():
             enclosure.upgrade_enclosure(new_fru.model, enclosure_model_number, enclosure_nameplate)
@@ -532,37 +659,50 @@ class Shop:
         if enclosure_numbers is None:
             enclosure_numbers = range(enclosure_count + plus_one_count)
 
-        for enclosure_number in enclosure_numbers:
+        # every enclosure is copied from the same template
+        template = self.templates.get_template('enclosure', model=enclosure_model, model_number=enclosure_model_number)
+
+        for i, enclosure_number in enumerate(enclosure_numbers):
             serial = self.get_serial('ENC')
-            enclosure = self.templates.find_component('enclosure', model=enclosure_model, model_number=enclosure_model_number,
-                                                      serial=serial, number=enclosure_number)
+            enclosure = template.copy(serial, number=enclosure_number)
             enclosures.append(enclosure)
             self.transact(serial, enclosure.model, enclosure.get_model_number(), enclosure.nameplate, None,
-                          'add enclosure', 'at', site_number, server.number, enclosure.number, costs[enclosure_numbers.index(enclosure_number)], reason=reason)
+                          'add enclosure', 'at', site_number, server.number, enclosure.number, costs[i], reason=reason)
 
         return enclosures
 
     # all FRUs in storage become deployable after one period
     def advance(self):
+        # FRU storage moves power curve forward
         for fru in self.storage:
-            # FRU storage moves power curve forward
             fru.store(self.thresholds['deploy months'])
 
-            # check if storage killed FRU
-            if fru.get_power() < self.thresholds['junk level']:
-                self.junked.append(fru)
-               
-                self.transact(fru.serial, fru.model, fru.get_model_number(), fru.get_power(), fru.get_efficiency(),
-                              'junked FRU', 'in storage', None, None, None, None, reason='power below {:0.1f}kw'.format(self.thresholds['junk level']))
+        # check if storage killed FRUs, reading each power once
+        junk_level = self.thresholds['junk level']
+        powers = array([fru.get_power() for fru in self.storage], dtype=float)
+        dead = powers < junk_level
 
-            else:
-                self.deployable.append(fru)
+        # split storage into deployable and junked FRUs and log the junked ones together
+        junked = [(fru, power) for fru, power, is_dead in zip(self.storage, powers, dead) if is_dead]
+        self.deployable.extend(fru for fru, is_dead in zip(self.storage, dead) if not is_dead)
+        self.junked.extend(fru for fru, _ in junked)
+
+        reason = 'power below {:0.1f}kw'.format(junk_level)
+        self.log_book.record_transactions([self.log_book.format_transaction(self.date, fru.serial, fru.model, fru.get_model_number(),
+                                                                            power, fru.get_efficiency(), 'junked FRU', 'in storage',
+                                                                            None, None, None, None, reason=reason)
+                                           for fru, power in junked])
 
         self.storage = []
+        self.new_models.clear() # module picks are only reused within a month
         self.date += relativedelta(months=1)
 
 # collection of sites and a shop to move FRUs between
 class Fleet:
+    __slots__ = ('total_sites', 'install_years', 'target_size', 'target_site', 'target_month', 'install_sizes',
+                 'install_months', 'install_counts', 'sites', 'sites_installed', 'shop', 'system_sizes',
+                 'system_dates')
+
     def __init__(self, target_size: float, total_sites: int, install_years: int, system_sizes: List[float], system_dates: List[date],
                  start_date: date, min_date: date):
         self.total_sites = total_sites
@@ -571,11 +711,12 @@ class Fleet:
         self.target_size = target_size
         self.target_site = 0
         self.target_month = 0
-        self.install_sizes = []
+        self.install_sizes = None
         self.install_months = None
-        self.install_months_count = None
+        self.install_counts = None
 
-        self.sites = []
+        self.sites = {} # active sites by site number
+        self.sites_installed = 0
         self.shop = None
 
         self.system_sizes = system_sizes
@@ -587,7 +728,7 @@ class Fleet:
 
     # pick sizes based on distribution for sites other than target
     def set_up_install_sizes(self):
-        self.install_sizes = self.system_sizes.sample(self.total_sites - 1, replace=True).to_list()
+        self.install_sizes = nprandom.choice(self.system_sizes.to_numpy(dtype=float), size=self.total_sites - 1, replace=True)
         return
         
     # pick months based on distribution for site installation
@@ -595,8 +736,15 @@ class Fleet:
         # max time to install
         population_dates = self.system_dates[self.system_dates >= self.system_dates.max() - relativedelta(years=self.install_years)]
         sampled_dates = population_dates.sample(self.total_sites, replace=self.total_sites >= len(population_dates))
-        self.install_months = (sampled_dates - sampled_dates.min()).dt.days.div(30).round().astype(int).sort_values()
-        self.install_months_count = self.install_months.value_counts(sort=False)
+
+        # approximate months since the first install from whole days
+        days = (sampled_dates - sampled_dates.min()).dt.days.to_numpy()
+        months = (days + 15) // 30
+        months.sort()
+        counts = bincount(months)
+
+        self.install_months = Series(months)
+        self.install_counts = counts # dense count for every month up to the last install
 
     # pick target install sequence order
     def set_up_target_site(self, start_date: date, min_date: date):
@@ -604,13 +752,13 @@ class Fleet:
         max_month = delta.years*12 + delta.months
 
         # pick a spot for the target site where the initial install date works
-        self.target_site = randrange(len(self.install_months[self.install_months <= max_month]))
+        self.target_site = randrange(searchsorted(self.install_months.to_numpy(), max_month, side='right')) # months are sorted
         self.target_month = self.install_months.iloc[self.target_site]
-        self.install_sizes.insert(self.target_site, self.target_size)
+        self.install_sizes = insert(self.install_sizes, self.target_site, self.target_size)
 
     # return number of sites to install in a given month
     def get_install_count(self, month: int) -> int:
-        count = self.install_months_count.get(month, 0)
+        count = int(self.install_counts[month]) if month < len(self.install_counts) else 0
         return count
         
     # add shop to fleet
@@ -620,12 +768,14 @@ class Fleet:
 
     # add site to fleet    
     def add_site(self, site: Site):
-        self.sites.append(site)
+        self.sites[site.number] = site
+        self.sites_installed += 1
         return
 
     # remove site from fleet
     def remove_site(self, site: Site):
-        self.sites = [s for s in self.sites if s is not site]
+        self.sites.pop(site.number, None)
+
         # record power and efficiency
         self.store_site_performance(site)
         self.store_fru_performance(site)
@@ -647,8 +797,8 @@ class Fleet:
             return transactions
 
     # combine transactions by year, site and action
-    def summarize_transactions(self, site_number: int = 'target') -> DataFrame:
-        if site_number == 'target':
+    def summarize_transactions(self, site_number: int = None) -> DataFrame:
+        if site_number is None:
             site_number = self.target_site
 
         transactions = self.shop.log_book.summarize_transactions(site_number)
@@ -656,26 +806,26 @@ class Fleet:
         return transactions
 
     # return power and efficiency of all a site
-    def summarize_site_performance(self, site_number: int = 'target') -> DataFrame:
-        if site_number == 'target':
+    def summarize_site_performance(self, site_number: int = None) -> DataFrame:
+        if site_number is None:
             site_number = self.target_site
 
-        for site in self.sites:
-            # add TMO and eff of any site that hasn't expired
-            self.store_site_performance(site)
+        # add TMO and eff if the site hasn't expired
+        if site_number in self.sites:
+            self.store_site_performance(self.sites[site_number])
 
         site_performance = self.shop.log_book.get_performance('site', site_number)
 
         return site_performance
 
     # return power and efficiency of all FRUs at a site
-    def get_fru_performance(self, site_number: int = 'target') -> DataFrame:
-        if site_number == 'target':
+    def get_fru_performance(self, site_number: int = None) -> DataFrame:
+        if site_number is None:
             site_number = self.target_site
 
-        for site in self.sites:
-            # add FRU perfromance of any site that hasn't expired
-            self.store_fru_performance(site)
+        # add FRU perfromance if the site hasn't expired
+        if site_number in self.sites:
+            self.store_fru_performance(self.sites[site_number])
        
         fru_performance = self.shop.log_book.get_performance('fru', site_number)
 
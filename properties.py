@@ -32,6 +32,8 @@ class Site:
     At the end of the contract, the site is
     decommissioned.
     '''
+    __slots__ = ('number', 'shop', 'contract', 'system_size', 'limits', 'windowed', 'monitor', 'servers', 'month')
+
     def __init__(self, number: int, shop: Shop, contract: Contract): 
         self.number = number
         self.shop = shop
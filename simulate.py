@@ -108,7 +108,7 @@ class Simulation:
        
     # create a site at the beginning of a phase
     def set_up_site(self, fleet: Fleet, month: int, random_layout: RandomLayout) -> Site:
-        site_number = len(fleet.sites)
+        site_number = fleet.sites_installed
         if site_number == fleet.target_site:
             site_name = '{} (TARGET)'.format(self.scenario.technology.site_name)
         else:
@@ -217,12 +217,17 @@ class Simulation:
 
                 fleet.add_site(site)
                         
-            for site in fleet.sites:
+            decommissioned_sites = []
+            for site in fleet.sites.values():
                 # check site status and move FRUs as required
                 decommissioned = self.inspect_site(fleet, site)
 
                 if decommissioned:
-                    fleet.remove_site(site)
+                    decommissioned_sites.append(site)
+
+            # remove expired sites once the fleet has been inspected
+            for site in decommissioned_sites:
+                fleet.remove_site(site)
                    
             # make units in shop deployable.phases
             fleet.shop.advance()
@@ -298,8 +303,8 @@ class Simulation:
 
     # pull the last FRU performance
     def get_fru_performance(self) -> Tuple[DataFrame, DataFrame]:
-        fru_power_sample = self.fru_performance[-1]['power'].drop('site', axis='columns')
-        fru_efficiency_sample = self.fru_performance[-1]['efficiency'].drop('site', axis='columns')
+        fru_power_sample = self.fru_performance[-1]['power']
+        fru_efficiency_sample = self.fru_performance[-1]['efficiency']
 
         return fru_power_sample, fru_efficiency_sample
 
@@ -8,7 +8,7 @@ from tkinter import Tk, filedialog
 
 # add-in imports
 from pandas import DataFrame, Series, Timestamp, read_sql, to_numeric, merge
-from numpy import nan
+from numpy import nan, lexsort
 from sqlalchemy import create_engine
 
 # self-defined imports
@@ -231,13 +231,13 @@ class SQLDB:
         server_details = read_sql(sql, self.connection)
 
         guess = server_details.query('model_number.str.startswith(@server_model_guess)', engine='python')
-        guess.loc[:, 'div'] = guess['nameplate'].rdiv(site_size)
-        guess.loc[:, 'fit'] = guess['div'].sub(guess['div'].astype(int))
-        guess.sort_values(['fit', 'standard'], ascending=[True, False], inplace=True)
 
         if not guess.empty:
-            # value found
-            server_model_number = guess['model_number'].iloc[0]
+            # value found, pick the closest fit and prefer standard models
+            div = site_size / guess['nameplate'].to_numpy()
+            fit = div - div.astype(int)
+            best = lexsort((-guess['standard'].to_numpy(), fit))[0]
+            server_model_number = guess['model_number'].iloc[best]
         else:
             # pick randomly
             server_model_number = self.get_table('Server').sample(1)['model_number'].iloc[0]